@@ -2,42 +2,35 @@
 
 import pathlib
 import argparse
-import re
+import concurrent.futures
+import functools
+from collections.abc import Callable
+from typing import Optional
 
+# Buffer size for reading namelist files
+_IO_BUFFER_SIZE = 1 << 20
 
-def find_longest_key(content: str) -> int:
+
+def find_longest_key(entries: list[tuple]) -> int:
     """
-    Find the length of the longest key in Fortran-namelist-style variable assignments.
+    Find the length of the longest key in parsed namelist entries.
 
     Parameters
     ----------
-    content : str
-        The full text content of the namelist file as a single string.
+    entries : list[tuple]
+        The tagged entries of a namelist as returned by `parse_nml`.
 
     Returns
     -------
     int
-        The length of the longest variable key (the string before '=') found in the input content.
+        The length of the longest variable key (the string before '=') found in the entries.
         Returns -1 if no keys are found.
 
     Notes
     -----
-    This function uses `parse_key_val_pair` to identify lines containing key-value pairs.
-    It ignores comment lines and lines that do not contain assignments.
+    Only `"kv"` entries are considered; blocks, comments and blank lines are ignored.
     """
-    longest_key = -1
-    for line in content.splitlines():
-        # Parse line
-        try:
-            key, _, _ = parse_key_val_pair(line)
-        except ValueError:
-            continue
-
-        # Overwrite longest key
-        if len(key) > longest_key:
-            longest_key = len(key)
-
-    return longest_key
+    return max((len(entry[1]) for entry in entries if entry[0] == "kv"), default=-1)
 
 
 def parse_key_val_pair(line: str) -> tuple[str, str, str]:
@@ -70,55 +63,38 @@ def parse_key_val_pair(line: str) -> tuple[str, str, str]:
     value_part = line
 
     # Comment handling
-    if "!" in line:
-        value_part, comment = line.split("!", 1)
-        comment = " ! " + comment.strip()
-
-    # Regex: Split on the first '=' with optional whitespace, allow leading comma
-    eq_match = re.match(r"\s*,?\s*([^\s=]+)\s*=+(.*)", value_part)
-    if eq_match:
-        key = eq_match.group(1)
-        value = eq_match.group(2).rstrip(", \t")
-        return key, value.strip(), comment
-    else:
+    idx = line.find("!")
+    if idx >= 0:
+        value_part = line[:idx]
+        comment = " ! " + line[idx + 1 :].strip()
+
+    # Split on the first '=' with optional whitespace, allow leading comma
+    key_part, sep, val_part = value_part.partition("=")
+    key = key_part.lstrip(" \t,").rstrip()
+    if not sep or not key or " " in key or "\t" in key:
         raise ValueError(f"No key matched in {line}")
 
+    value = val_part.lstrip("=").rstrip(", \t")
+    return key, value.strip(), comment
 
-def format_line(
-    line: str,
-    align_eq_to: int,
-    block_indent: int,
-    trailing_comma: bool,
-    keep_comments: bool,
-) -> str:
+
+def normalize_value(value: str) -> str:
     """
-    Format a Fortran namelist assignment line with proper alignment, indentation,
-    comma, and optional comment retention.
+    Standardize the value string of a Fortran namelist assignment.
 
     Parameters
     ----------
-    line : str
-        The original line containing a key-value assignment.
-    align_eq_to : int
-        The column at which to align the equal sign '='.
-    block_indent : int
-        The number of spaces to prepend to the formatted line.
-    trailing_comma : bool
-        Whether to put a comma after the value.
-    keep_comments : bool
-        Whether to retain comments at the end of the line.
+    value : str
+        The value(s) assigned to a key, as returned by `parse_key_val_pair`.
 
     Returns
     -------
     str
-        The line formatted according to the specified options.
+        The value with uniform list separators, booleans and quotation marks.
     """
     TRUE_REPR = [".t.", ".TRUE."]
     FALSE_REPR = [".f.", ".FALSE."]
 
-    # Parse line into key, value, and comment
-    key, value, comment = parse_key_val_pair(line)
-
     # For value lists, ensure uniform whitespace after commas
     if "," in value:
         value = ", ".join([item.strip() for item in value.split(",")])
@@ -130,18 +106,180 @@ def format_line(
         value = value.replace(bool_str, ".false.")
 
     # Standardize quotation marks to single quotes
-    value = value.replace('"', "'")
+    return value.replace('"', "'")
+
 
-    # Calculate spaces for alignment
-    eq_offset = max(align_eq_to - len(key) - 1, 1)
+def make_kv_formatter(
+    align_eq_to: int,
+    indent_str: str,
+    trailing_comma: bool,
+    keep_comments: bool,
+) -> Callable[[str, str, str], str]:
+    """
+    Create a formatter for parsed Fortran namelist assignments with proper alignment,
+    indentation, comma, and optional comment retention.
 
-    # Compose output pieces
-    out_comment = comment if keep_comments else ""
+    Parameters
+    ----------
+    align_eq_to : int
+        The column at which to align the equal sign '='.
+    indent_str : str
+        The indentation to prepend to the formatted line.
+    trailing_comma : bool
+        Whether to put a comma after the value.
+    keep_comments : bool
+        Whether to retain comments at the end of the line.
+
+    Returns
+    -------
+    Callable[[str, str, str], str]
+        A function taking the key, value and comment as returned by `parse_key_val_pair`
+        and returning the line formatted according to the specified options.
+
+    Notes
+    -----
+    The options are fixed for a whole namelist, so they are resolved once here
+    instead of on every formatted line.
+    """
     out_comma = "," if trailing_comma else ""
 
-    return (
-        f"{' ' * block_indent}{key}{' ' * eq_offset} = {value}{out_comma}{out_comment}"
-    )
+    # Number of spaces before the '=' for every key length, longer keys get one
+    pad_table = [max(align_eq_to - n - 1, 1) for n in range(max(align_eq_to, 0) + 2)]
+    max_len = len(pad_table) - 1
+
+    if keep_comments:
+
+        def format_kv(key: str, value: str, comment: str) -> str:
+            pad = pad_table[min(len(key), max_len)]
+            value = normalize_value(value)
+            return f"{indent_str}{key}{' ' * pad} = {value}{out_comma}{comment}"
+
+    else:
+
+        def format_kv(key: str, value: str, comment: str) -> str:
+            pad = pad_table[min(len(key), max_len)]
+            value = normalize_value(value)
+            return f"{indent_str}{key}{' ' * pad} = {value}{out_comma}"
+
+    return format_kv
+
+
+def parse_nml(content: str) -> list[tuple]:
+    """
+    Parse the content of a Fortran namelist into a list of tagged entries.
+
+    Parameters
+    ----------
+    content : str
+        The full text content of the namelist file as a single string.
+
+    Returns
+    -------
+    list[tuple]
+        One entry per relevant line, tagged by its first element:
+
+        - ``("header", text)`` for a namelist start (``&name``), lowercased
+        - ``("end",)`` for a namelist end (``/``)
+        - ``("blank",)`` for a whiteline inside a block
+        - ``("comment", text, in_block)`` for a full line comment, without the leading '!'
+        - ``("kv", key, value, comment)`` for an assignment, see `parse_key_val_pair`
+
+    Raises
+    ------
+    ValueError
+        If a line is none of the above and not a valid key-value assignment.
+
+    Notes
+    -----
+    Every line is parsed exactly once, so the entries can be used both for
+    finding the longest key and for rendering the formatted output.
+    """
+    in_block = False
+    entries = []
+
+    # Local aliases avoid repeated attribute and global lookups in the loop
+    append = entries.append
+    parse_line = parse_key_val_pair
+
+    for line in content.splitlines():
+        # Remove \n and trailing spaces
+        line = line.rstrip()
+        stripped = line.lstrip()
+
+        # The kind of line is determined by its first non-space character
+        first_char = stripped[:1]
+
+        # Check whether inside a block (namelist start)
+        if first_char == "&":
+            in_block = True
+            append(("header", stripped.lower()))
+
+        # Check whether outside a block (namelist end)
+        elif stripped == "/":
+            in_block = False
+            append(("end",))
+
+        # Whitelines only matter inside a block
+        elif not first_char:
+            if in_block:
+                append(("blank",))
+
+        # Full line comments
+        elif first_char == "!":
+            append(("comment", stripped[1:].strip(), in_block))
+
+        # Inside block
+        else:
+            append(("kv", *parse_line(line)))
+
+    return entries
+
+
+def render_entry(
+    entry: tuple,
+    indent_str: str,
+    format_kv: Callable[[str, str, str], str],
+) -> str:
+    """
+    Render a single parsed namelist entry as formatted text.
+
+    Parameters
+    ----------
+    entry : tuple
+        A tagged entry as returned by `parse_nml`.
+    indent_str : str
+        The indentation of lines inside a block.
+    format_kv : Callable[[str, str, str], str]
+        The formatter for assignments, as returned by `make_kv_formatter`.
+
+    Returns
+    -------
+    str
+        The formatted text of the entry. A namelist end is followed by a newline
+        so blocks are separated by a whiteline.
+    """
+    kind = entry[0]
+
+    # Namelist start
+    if kind == "header":
+        return entry[1]
+
+    # Namelist end
+    if kind == "end":
+        return "/\n"
+
+    # Whitelines in block
+    if kind == "blank":
+        return ""
+
+    # Full line comments
+    if kind == "comment":
+        indent = "" if not entry[2] else indent_str
+        return indent + "! " + entry[1]
+
+    # Inside block
+    _, key, value, comment = entry
+    return format_kv(key, value, comment)
 
 
 def format_nml(
@@ -182,82 +320,120 @@ def format_nml(
     - Supports preserving block structure, full-line comments, and optionally trailing commas.
     """
 
-    # Read nml
-    nml_content = path_to_nml.read_text()
+    # Read and parse nml
+    with open(path_to_nml, "r", encoding="utf-8", buffering=_IO_BUFFER_SIZE) as f:
+        nml_content = f.read()
+    entries = parse_nml(nml_content)
 
     # Find longest key
-    longest_key = find_longest_key(nml_content)
+    longest_key = find_longest_key(entries)
     align_eq_to = longest_key + eq_offset
+    indent_str = " " * block_indent
+    format_kv = make_kv_formatter(
+        align_eq_to, indent_str, trailing_comma, keep_comments
+    )
 
-    # Format the lines accordingly
-    in_block = False
-    mod_lines = []
-    for line in nml_content.splitlines():
-        # Remove \n and trailing spaces
-        line = line.strip("\n")
-        line = line.rstrip()
+    # Drop the entries which are not wanted in the output
+    skipped = set()
+    if not keep_whitelines:
+        skipped.add("blank")
+    if not keep_comments:
+        skipped.add("comment")
 
-        # Check whether inside a block (namelist start)
-        if line.strip().startswith("&"):
-            in_block = True
-            mod_lines.append(line.strip().lower())
-            continue
+    # Format the entries accordingly
+    mod_lines = [
+        render_entry(entry, indent_str, format_kv)
+        for entry in entries
+        if entry[0] not in skipped
+    ]
 
-        # Check whether outside a block (namelist end)
-        if line.strip() == "/":
-            in_block = False
-            mod_lines.append(line.strip())
-            mod_lines.append("")
-            continue
+    return "\n".join(mod_lines)
 
-        # Keep whitelines in block if wanted
-        if line == "":
-            if keep_whitelines and in_block:
-                mod_lines.append(line)
-            else:
-                continue
 
-        # Full line comments
-        elif line.strip().startswith("!"):
-            if keep_comments:
-                indent = "" if not in_block else " " * block_indent
-                mod_lines.append(indent + "! " + line.strip()[1:].strip())
-            else:
-                continue
+def format_file(
+    path_to_nml: pathlib.Path,
+    output_path: Optional[pathlib.Path],
+    eq_offset: int,
+    block_indent: int,
+    trailing_comma: bool,
+    keep_comments: bool,
+    keep_whitelines: bool,
+) -> None:
+    """
+    Format a Fortran namelist file and write the result.
 
-        # Inside block
-        else:
-            mod_lines.append(
-                format_line(
-                    line, align_eq_to, block_indent, trailing_comma, keep_comments
-                )
-            )
+    Parameters
+    ----------
+    path_to_nml : pathlib.Path
+        Path to the Fortran namelist file to be formatted.
+    output_path : pathlib.Path or None
+        Path to write the formatted namelist to. If None, the namelist is formatted in place.
+    eq_offset, block_indent, trailing_comma, keep_comments, keep_whitelines
+        Formatting options, see `format_nml`.
 
-    return "\n".join(mod_lines)
+    Raises
+    ------
+    ValueError
+        If `output_path` points to the namelist itself.
+
+    Notes
+    -----
+    This is a module level function so it can be dispatched to worker processes.
+    """
+    # Format namelist
+    formatted_lines = format_nml(
+        path_to_nml,
+        eq_offset=eq_offset,
+        block_indent=block_indent,
+        trailing_comma=trailing_comma,
+        keep_comments=keep_comments,
+        keep_whitelines=keep_whitelines,
+    )
+
+    # Safety check
+    if output_path is not None and output_path.resolve() == path_to_nml.resolve():
+        raise ValueError("Output path cannot be identical to namelist path.")
+
+    # Determine output path
+    if output_path is None:
+        output_path = path_to_nml
+
+    # Write result
+    output_path.write_text(formatted_lines, encoding="utf-8")
 
 
 if __name__ == "__main__":
     # CLI parser configuration
     parser = argparse.ArgumentParser(
         description=(
-            "Format a FORTRAN namelist file. To avoid formatting in place "
+            "Format FORTRAN namelist files. To avoid formatting in place "
             "use --output option."
         ),
     )
     parser.add_argument(
         "namelist",
         type=pathlib.Path,
-        help="Path to the FORTRAN namelist file to format",
+        nargs="+",
+        help="Path(s) to the FORTRAN namelist file(s) to format",
     )
     parser.add_argument(
         "--output",
         type=pathlib.Path,
         default=None,
         help=(
-            "Optional output path. "
+            "Optional output path, only allowed for a single namelist. "
             "If not given, the input namelist is overwritten in place."
         ),
     )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes when formatting multiple namelists "
+            "(default: number of CPUs)"
+        ),
+    )
     parser.add_argument(
         "--block-indentation",
         type=int,
@@ -296,9 +472,18 @@ if __name__ == "__main__":
     # Parse arguments
     args = parser.parse_args()
 
-    # Format namelist
-    formatted_lines = format_nml(
-        args.namelist,
+    # Each namelist is formatted only once, even if given multiple times
+    namelists = list({path.resolve(): path for path in args.namelist}.values())
+
+    # Safety checks
+    if args.output is not None and len(namelists) > 1:
+        parser.error("--output can only be used with a single namelist")
+    if args.parallel is not None and args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    # Fix the formatting options for all namelists
+    format_one = functools.partial(
+        format_file,
         eq_offset=args.eq_offset,
         block_indent=args.block_indentation,
         trailing_comma=args.trailing_comma,
@@ -306,12 +491,18 @@ if __name__ == "__main__":
         keep_whitelines=args.keep_whitelines,
     )
 
-    # Safety check
-    if args.output is not None and args.output.resolve() == args.namelist.resolve():
-        raise ValueError("Output path cannot be identical to namelist path.")
-
-    # Determine output path
-    output_path = args.output if args.output is not None else args.namelist
-
-    # Write result
-    output_path.write_text(formatted_lines, encoding="utf-8")
+    # Format namelists, in parallel if there are several
+    if len(namelists) == 1:
+        format_one(namelists[0], args.output)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.parallel) as pool:
+            futures = {pool.submit(format_one, path, None): path for path in namelists}
+
+            # Raise errors from the workers along with the failing namelist
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as err:
+                    raise RuntimeError(
+                        f"Failed to format {futures[future]}: {err}"
+                    ) from err